@@ -3,29 +3,178 @@ Earnings Beat Scanner - Predicts potential earnings beats before announcements
 Monitors: Earnings ESP, insider buying, analyst activity, guidance, buybacks, industry trends
 """
 
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
 import requests
-import json
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import yfinance as yf
-from bs4 import BeautifulSoup
-import pandas as pd
-from collections import defaultdict
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Set, Tuple
+from requests.adapters import HTTPAdapter
+from requests_ratelimiter import LimiterAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+from numba import njit
+from tools.cache import FileCache
+
+# yfinance and pandas are slow to import, so they are imported where used -
+# a run that exits early (e.g. missing webhook) never pays for them
+if TYPE_CHECKING:
+    import pandas as pd
+    import yfinance as yf
+
+# Insider/analyst classification patterns, compiled once rather than per ticker
+_UPGRADE_RE = re.compile(r'buy|outperform|overweight', re.IGNORECASE)
+_DOWNGRADE_RE = re.compile(r'sell|underperform|underweight', re.IGNORECASE)
+_PURCHASE_RE = re.compile(r'purchase', re.IGNORECASE)
+
+
+# Scoring kernels - compiled on first call, so nothing is built unless a scan runs
+@njit(cache=True)
+def _score_esp(up_revisions, down_revisions):
+    """Score upward EPS revisions in the last 7 days (max 30)"""
+    if up_revisions > down_revisions:
+        return int(min(30.0, up_revisions * 5.0))
+    return 0
+
+
+@njit(cache=True)
+def _score_momentum(pct_change, pct_from_high):
+    """Score 10-day price change plus proximity to the 30-day high (max 25)"""
+    score = 0
+    if pct_change > 5:
+        score += 15
+    elif pct_change > 2:
+        score += 10
+    
+    # Near highs (consolidation at highs = bullish)
+    if pct_from_high > -3:
+        score += 10
+    return score
+
+
+@njit(cache=True)
+def _score_beats(beats, total):
+    """Score the share of recent quarters that beat estimates (max 20)"""
+    beat_rate = beats / total
+    if beat_rate >= 0.75:  # 75%+ beat rate
+        return 20
+    elif beat_rate >= 0.50:
+        return 10
+    return 0
+
+
+@njit(cache=True)
+def _score_sector(outperformance):
+    """Score sector ETF outperformance versus SPY (max 15)"""
+    if outperformance > 2:
+        return 15
+    elif outperformance > 0:
+        return 10
+    return 0
+
+
+@dataclass(slots=True)
+class CheckResult:
+    """Outcome of a single pre-earnings check"""
+    has_data: bool = False
+    score: int = 0
+    signal: str = ''
+    signals: Tuple[str, ...] = ()
+    details: Optional[Dict[str, Any]] = None  # Check-specific metrics, only when there is data
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """Combined score and signals for one stock ahead of earnings"""
+    ticker: str
+    company: str
+    earnings_date: datetime
+    sector: str
+    total_score: int = 0
+    signals: List[Tuple[str, int, str]] = field(default_factory=list)
+
 
 class EarningsBeatScanner:
+    # Sector ETFs used as the benchmark for sector momentum
+    SECTOR_ETFS = {
+        'Technology': 'XLK',
+        'Financial Services': 'XLF',
+        'Healthcare': 'XLV',
+        'Consumer Cyclical': 'XLY',
+        'Industrials': 'XLI',
+        'Energy': 'XLE',
+        'Consumer Defensive': 'XLP',
+        'Real Estate': 'XLRE',
+        'Communication Services': 'XLC',
+        'Utilities': 'XLU',
+        'Basic Materials': 'XLB'
+    }
+    
     def __init__(self, discord_webhook_url: str):
         self.discord_webhook = discord_webhook_url
         self.headers = {
             'User-Agent': 'Earnings Research Bot mitch@example.com'
         }
         self.alert_threshold = 70  # Minimum score for alert
+        self.max_workers = 8  # Stocks analyzed in parallel
+        self.yahoo_requests_per_second = 4  # Shared across all worker threads
+        self.request_timeout = 15  # Seconds before a direct HTTP request gives up
+        
+        # One keep-alive session for Discord and Yahoo. Yahoo GETs are rate-limited and
+        # retried on rate limits and server errors; the limiter throttles every request
+        # made through it, whichever thread sends it.
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        yahoo_adapter = LimiterAdapter(
+            per_second=self.yahoo_requests_per_second,
+            per_host=False,
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                respect_retry_after_header=True
+            )
+        )
+        self._session.mount('https://', yahoo_adapter)
+        
+        # Webhook POSTs aren't idempotent - a 5xx may arrive after Discord accepted the
+        # message - so only retry when Discord explicitly rate-limits us
+        discord_adapter = HTTPAdapter(
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1.5,
+                status_forcelist=[429],
+                allowed_methods=['POST'],
+                respect_retry_after_header=True
+            )
+        )
+        self._session.mount('https://discord.com/', discord_adapter)
+        self._session.mount('https://discordapp.com/', discord_adapter)
+        
+        self._ticker_cache: Dict[str, yf.Ticker] = {}
+        self._price_history: Optional[pd.DataFrame] = None  # Batched 1-month history
+        self._sector_returns: Dict[str, float] = {}  # 10-day return per sector ETF
+        self._spy_return: Optional[float] = None
+        self._cache = FileCache()  # Persists Yahoo responses between runs
+        
+        # Reference time shared by every check; refreshed at the start of each scan
+        self._now = datetime.now()
+        self._recent_30d = self._now - timedelta(days=30)
         print(f"🎯 Alert threshold set to: {self.alert_threshold}")
         
-    def send_discord_alert(self, title: str, description: str, color: int = 3447003, 
-                          fields: List[Dict[str, Any]] = None):
-        """Send formatted alert to Discord"""
-        embed = {
+    def build_embed(self, title: str, description: str, color: int = 3447003,
+                    fields: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a formatted Discord embed"""
+        return {
             "title": title,
             "description": description,
             "color": color,
@@ -33,13 +182,50 @@ class EarningsBeatScanner:
             "fields": fields or [],
             "footer": {"text": "Earnings Beat Scanner • Paper Trading Only"}
         }
-        
-        payload = {"embeds": [embed]}
+    
+    def send_discord_alert(self, title: str, description: str, color: int = 3447003, 
+                          fields: List[Dict[str, Any]] = None):
+        """Send formatted alert to Discord"""
+        self._post_embeds([self.build_embed(title, description, color, fields)])
+    
+    def send_discord_batch(self, embeds: List[Dict[str, Any]]):
+        """Send embeds to Discord in as few webhook posts as the limits allow"""
+        for i, chunk in enumerate(self._chunk_embeds(embeds)):
+            if i > 0:
+                time.sleep(1)  # Stay well under Discord's webhook rate limit
+            self._post_embeds(chunk)
+    
+    @staticmethod
+    def _chunk_embeds(embeds: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group embeds into messages of at most 10 embeds and 6000 characters"""
+        def embed_length(embed: Dict[str, Any]) -> int:
+            return (len(embed.get("title", "")) + len(embed.get("description", "")) +
+                    len(embed.get("footer", {}).get("text", "")) +
+                    sum(len(f["name"]) + len(f["value"]) for f in embed.get("fields", [])))
+        
+        chunks = []
+        current, current_length = [], 0
+        for embed in embeds:
+            length = embed_length(embed)
+            if current and (len(current) == 10 or current_length + length > 6000):
+                chunks.append(current)
+                current, current_length = [], 0
+            current.append(embed)
+            current_length += length
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _post_embeds(self, embeds: List[Dict[str, Any]]):
+        """POST one webhook message containing the given embeds"""
+        payload = {"embeds": embeds}
+        titles = ", ".join(embed["title"] for embed in embeds)
         
         try:
-            response = requests.post(self.discord_webhook, json=payload)
+            response = self._session.post(self.discord_webhook, json=payload, timeout=self.request_timeout)
             if response.status_code == 204:
-                print(f"✓ Alert sent: {title}")
+                print(f"✓ Alert sent: {titles}")
             else:
                 print(f"✗ Discord alert failed: {response.status_code}")
         except Exception as e:
@@ -70,41 +256,34 @@ class EarningsBeatScanner:
                 'DIS', 'NFLX', 'PYPL', 'SQ', 'SHOP'
             ]
             
-            today = datetime.now()
+            today = self._now
             cutoff = today + timedelta(days=days_ahead)
             
-            for ticker in sample_tickers:
-                try:
-                    stock = yf.Ticker(ticker)
-                    
-                    # Get earnings date from calendar
-                    calendar = stock.calendar
-                    if calendar is not None and not calendar.empty:
-                        if 'Earnings Date' in calendar.index:
-                            earnings_date_val = calendar.loc['Earnings Date']
-                            
-                            # Handle different date formats
-                            if isinstance(earnings_date_val, pd.Series):
-                                earnings_date = pd.to_datetime(earnings_date_val.iloc[0])
-                            else:
-                                earnings_date = pd.to_datetime(earnings_date_val)
-                            
-                            # Check if within our window
-                            if today <= earnings_date <= cutoff:
-                                info = stock.info
-                                earnings_stocks.append({
-                                    'ticker': ticker,
-                                    'earnings_date': earnings_date,
-                                    'company': info.get('longName', ticker),
-                                    'market_cap': info.get('marketCap', 0),
-                                    'sector': info.get('sector', 'Unknown')
-                                })
-                                print(f"  ✓ Found: {ticker} earnings on {earnings_date.strftime('%Y-%m-%d')}")
-                    
-                    time.sleep(0.5)  # Rate limiting
-                    
-                except Exception as e:
+            # Narrow the list with Yahoo's bulk calendar before any per-ticker requests
+            try:
+                reporting = self._fetch_earnings_calendar(today, cutoff)
+                candidates = [ticker for ticker in sample_tickers if ticker in reporting]
+                print(f"  {len(candidates)} of {len(sample_tickers)} tickers on the earnings calendar")
+            except Exception as e:
+                print(f"  ✗ Bulk earnings calendar unavailable, checking every ticker: {e}")
+                candidates = sample_tickers
+            
+            calendars = asyncio.run(self._fetch_all_calendars(candidates))
+            
+            for ticker, calendar in zip(candidates, calendars):
+                if isinstance(calendar, Exception):
+                    print(f"  ✗ Calendar fetch failed for {ticker}: {calendar}")
                     continue
+                
+                # Skip tickers with no scheduled earnings
+                if calendar is None:
+                    continue
+                
+                # Check if within our window
+                earnings_date = calendar['earnings_date']
+                if today <= earnings_date <= cutoff:
+                    earnings_stocks.append(calendar)
+                    print(f"  ✓ Found: {calendar['ticker']} earnings on {earnings_date.strftime('%Y-%m-%d')}")
             
             print(f"  Found {len(earnings_stocks)} stocks with upcoming earnings")
             
@@ -113,16 +292,195 @@ class EarningsBeatScanner:
         
         return earnings_stocks
     
-    def calculate_earnings_esp(self, ticker: str) -> Dict[str, Any]:
+    def _fetch_earnings_calendar(self, start: datetime, end: datetime,
+                                 page_size: int = 100, max_pages: int = 20) -> Set[str]:
+        """Fetch the symbols of every company reporting between start and end from Yahoo's earnings calendar"""
+        import pandas as pd
+        
+        url = "https://finance.yahoo.com/calendar/earnings"
+        symbols = set()
+        
+        for page_num in range(max_pages):
+            params = {
+                'from': start.strftime('%Y-%m-%d'),
+                'to': end.strftime('%Y-%m-%d'),
+                'offset': page_num * page_size,
+                'size': page_size
+            }
+            response = self._session.get(url, params=params, timeout=self.request_timeout)
+            response.raise_for_status()
+            
+            try:
+                page = pd.read_html(io.StringIO(response.text), flavor='lxml')[0]
+            except ValueError:
+                if page_num == 0:
+                    # A consent page or layout change, not an empty calendar
+                    raise ValueError("no earnings table on the calendar page")
+                break  # No table - past the last page
+            
+            symbols.update(page['Symbol'])
+            if len(page) < page_size:
+                break
+        
+        return symbols
+    
+    async def _fetch_all_calendars(self, tickers: List[str]) -> List[Any]:
+        """Fetch earnings calendars for all tickers concurrently"""
+        semaphore = asyncio.Semaphore(8)
+        tasks = [self._fetch_calendar(semaphore, ticker) for ticker in tickers]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _fetch_calendar(self, semaphore: asyncio.Semaphore, ticker: str) -> Optional[Dict[str, Any]]:
+        """Fetch earnings date, company name, market cap and sector for one ticker"""
+        # yfinance's HTTP client is blocking, so each request runs on a worker thread
+        async with semaphore:
+            data = await asyncio.to_thread(self._quote_summary, ticker)
+        
+        results = data.get('quoteSummary', {}).get('result') or []
+        if not results:
+            return None
+        
+        result = results[0]
+        earnings_dates = result.get('calendarEvents', {}).get('earnings', {}).get('earningsDate') or []
+        if not earnings_dates:
+            return None
+        
+        price = result.get('price', {})
+        profile = result.get('summaryProfile', {})
+        
+        return {
+            'ticker': ticker,
+            'earnings_date': datetime.fromtimestamp(earnings_dates[0]['raw']),
+            'company': price.get('longName') or ticker,
+            'market_cap': price.get('marketCap', {}).get('raw', 0),
+            'sector': profile.get('sector', 'Unknown')
+        }
+    
+    def _quote_summary(self, ticker: str) -> Dict[str, Any]:
+        """GET the quoteSummary calendarEvents, summaryProfile and price modules"""
+        from yfinance.data import YfData
+        
+        # quoteSummary rejects requests without Yahoo's cookie and crumb; YfData
+        # performs that handshake, and the shared session retries 429s
+        url = f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{ticker}"
+        params = {'modules': 'calendarEvents,summaryProfile,price'}
+        return self._cache.get_or_compute(
+            (ticker, 'calendar'),
+            lambda: YfData(session=self._session).get_raw_json(url, params=params)
+        )
+    
+    def _get_ticker(self, ticker: str) -> yf.Ticker:
+        """Return a single shared yf.Ticker per symbol for the current scan"""
+        import yfinance as yf
+        
+        if ticker not in self._ticker_cache:
+            self._ticker_cache[ticker] = yf.Ticker(ticker, session=self._session)
+        return self._ticker_cache[ticker]
+    
+    # Each attribute access on a yf.Ticker is an HTTP round-trip, so memoize
+    # the ones the checks share instead of re-fetching them per check. Results
+    # are also persisted to the on-disk cache so later runs can reuse them.
+    def _fetch_cached(self, ticker: str, endpoint: str, fetch):
+        return self._cache.get_or_compute((ticker, endpoint), lambda: fetch(self._get_ticker(ticker)))
+    
+    @lru_cache(maxsize=128)
+    def _recommendations(self, ticker: str) -> Optional[pd.DataFrame]:
+        return self._fetch_cached(ticker, 'recommendations', lambda stock: stock.recommendations)
+    
+    @lru_cache(maxsize=128)
+    def _analysis(self, ticker: str) -> Optional[pd.DataFrame]:
+        return self._fetch_cached(ticker, 'analysis', lambda stock: stock.analysis)
+    
+    @lru_cache(maxsize=128)
+    def _insider_transactions(self, ticker: str) -> Optional[pd.DataFrame]:
+        return self._fetch_cached(ticker, 'insider_transactions', lambda stock: stock.insider_transactions)
+    
+    @lru_cache(maxsize=128)
+    def _earnings_dates(self, ticker: str) -> Optional[pd.DataFrame]:
+        return self._fetch_cached(ticker, 'earnings_dates', lambda stock: stock.earnings_dates)
+    
+    @lru_cache(maxsize=128)
+    def _history(self, ticker: str, period: str) -> pd.DataFrame:
+        return self._fetch_cached(ticker, f'history-{period}', lambda stock: stock.history(period=period))
+    
+    def _download_price_history(self, symbols: List[str]):
+        """Download 1-month history for all symbols in one batched request"""
+        import yfinance as yf
+        
+        print(f"\n📈 Downloading price history for {len(symbols)} symbols...")
+        
+        def download():
+            frame = yf.download(
+                symbols, period='1mo', group_by='ticker', threads=True,
+                auto_adjust=False, progress=False, session=self._session
+            )
+            return frame if not frame.empty else None  # Don't cache a failed download
+        
+        # Keyed on the symbol set, which changes with the upcoming-earnings list
+        digest = hashlib.md5(','.join(symbols).encode()).hexdigest()
+        
+        try:
+            self._price_history = self._cache.get_or_compute(('_batch', f'history-1mo-{digest}'), download)
+        except Exception as e:
+            print(f"  ✗ Batch price download failed: {e}")
+            self._price_history = None
+    
+    def _price_frame(self, symbol: str) -> pd.DataFrame:
+        """Return 1-month history for a symbol, preferring the batched download"""
+        if self._price_history is not None and symbol in self._price_history.columns.get_level_values(0):
+            return self._price_history[symbol].dropna(how='all')
+        return self._history(symbol, '1mo')
+    
+    def _stacked_closes(self, symbols: List[str]) -> pd.DataFrame:
+        """Return closes for the given symbols as one [days, symbols] frame"""
+        import pandas as pd
+        
+        if self._price_history is not None:
+            return self._price_history.xs('Close', axis=1, level=1).reindex(columns=symbols)
+        
+        columns = {}
+        for symbol in symbols:
+            try:
+                columns[symbol] = self._history(symbol, '1mo')['Close']
+            except Exception as e:
+                print(f"  ✗ No price history for {symbol}: {e}")
+        return pd.DataFrame(columns).reindex(columns=symbols)
+    
+    def _compute_sector_returns(self):
+        """Compute 10-day returns for every sector ETF and SPY once per scan"""
+        etfs = list(self.SECTOR_ETFS.values())
+        stacked = self._stacked_closes(etfs + ['SPY']).dropna(how='all')
+        
+        # Fill each column's gaps from its own neighbouring closes so one missing
+        # bar doesn't blank out a whole sector; fully missing symbols stay NaN
+        closes = stacked.ffill().tail(10).bfill().to_numpy()
+        
+        # One vectorized pass over all series
+        if closes.shape[0] > 0:
+            returns = (closes[-1] / closes[0] - 1.0) * 100.0
+        else:
+            returns = np.full(len(etfs) + 1, np.nan)
+        
+        self._sector_returns = dict(zip(etfs, returns[:-1]))
+        self._spy_return = returns[-1]
+    
+    def _clear_caches(self):
+        """Drop memoized Yahoo data so each scan starts fresh"""
+        self._ticker_cache.clear()
+        self._price_history = None
+        self._sector_returns = {}
+        self._spy_return = None
+        for accessor in (self._recommendations, self._analysis,
+                         self._insider_transactions, self._earnings_dates, self._history):
+            accessor.cache_clear()
+    
+    def calculate_earnings_esp(self, ticker: str) -> CheckResult:
         """Calculate Earnings ESP (Expected Surprise Prediction)"""
         print(f"  Calculating ESP for {ticker}...")
         
         try:
-            stock = yf.Ticker(ticker)
-            
-            # Get analyst recommendations and estimates
-            recommendations = stock.recommendations
-            analysis = stock.analysis
+            # Get analyst estimates
+            analysis = self._analysis(ticker)
             
             if analysis is not None and not analysis.empty:
                 # Get EPS estimates
@@ -158,48 +516,50 @@ class EarningsBeatScanner:
                                 up_revisions = revisions.get('upLast7days', 0)
                                 down_revisions = revisions.get('downLast7days', 0)
                                 
-                                if up_revisions > down_revisions:
-                                    esp_score = min(30, up_revisions * 5)  # Max 30 points
+                                esp_score = _score_esp(float(up_revisions), float(down_revisions))
                         except:
                             pass
                     
-                    return {
-                        'has_data': True,
-                        'esp_score': esp_score,
-                        'mean_estimate': eps_data['mean_estimate'],
-                        'signal_strength': 'Strong' if esp_score > 20 else 'Moderate' if esp_score > 10 else 'Weak'
-                    }
+                    return CheckResult(
+                        has_data=True,
+                        score=esp_score,
+                        signal='Strong' if esp_score > 20 else 'Moderate' if esp_score > 10 else 'Weak',
+                        details={'mean_estimate': eps_data['mean_estimate']}
+                    )
             
-            return {'has_data': False, 'esp_score': 0}
+            return CheckResult()
             
         except Exception as e:
             print(f"    ✗ ESP calculation error: {e}")
-            return {'has_data': False, 'esp_score': 0}
+            return CheckResult()
     
-    def check_insider_activity(self, ticker: str) -> Dict[str, Any]:
+    def check_insider_activity(self, ticker: str) -> CheckResult:
         """Check recent insider buying (bullish signal before earnings)"""
+        import pandas as pd
+        
         print(f"  Checking insider activity for {ticker}...")
         
         try:
-            stock = yf.Ticker(ticker)
-            
             # Get insider transactions
-            insider_trades = stock.insider_transactions
+            insider_trades = self._insider_transactions(ticker)
             
             if insider_trades is not None and not insider_trades.empty:
                 # Look at last 30 days
-                recent_date = datetime.now() - timedelta(days=30)
+                recent_date = self._recent_30d
                 
                 # Filter for purchases only
                 if 'Transaction' in insider_trades.columns:
-                    purchases = insider_trades[
-                        (insider_trades['Transaction'].str.contains('Purchase', case=False, na=False)) &
-                        (pd.to_datetime(insider_trades.index) > recent_date)
-                    ]
+                    # Parse the index once instead of inside the filter expression
+                    trade_dates = pd.to_datetime(insider_trades.index, errors='coerce')
+                    mask = (
+                        insider_trades['Transaction'].str.contains(_PURCHASE_RE, na=False) &
+                        (trade_dates > recent_date)
+                    )
+                    num_insiders = int(mask.sum())
                     
-                    if len(purchases) > 0:
+                    if num_insiders > 0:
+                        purchases = insider_trades.loc[mask]
                         total_value = purchases['Value'].sum() if 'Value' in purchases.columns else 0
-                        num_insiders = len(purchases)
                         
                         # Score based on activity
                         score = 0
@@ -210,41 +570,43 @@ class EarningsBeatScanner:
                         elif num_insiders == 1:
                             score = 10
                         
-                        return {
-                            'has_activity': True,
-                            'score': score,
-                            'num_purchases': num_insiders,
-                            'signal': 'Cluster buying' if num_insiders >= 3 else 'Insider buying'
-                        }
+                        return CheckResult(
+                            has_data=True,
+                            score=score,
+                            signal='Cluster buying' if num_insiders >= 3 else 'Insider buying',
+                            details={'num_purchases': num_insiders, 'total_value': total_value}
+                        )
             
-            return {'has_activity': False, 'score': 0}
+            return CheckResult()
             
         except Exception as e:
             print(f"    ✗ Insider check error: {e}")
-            return {'has_activity': False, 'score': 0}
+            return CheckResult()
     
-    def check_analyst_activity(self, ticker: str) -> Dict[str, Any]:
+    def check_analyst_activity(self, ticker: str) -> CheckResult:
         """Check recent analyst upgrades and price target raises"""
+        import pandas as pd
+        
         print(f"  Checking analyst activity for {ticker}...")
         
         try:
-            stock = yf.Ticker(ticker)
-            
             # Get recommendations
-            recommendations = stock.recommendations
+            recommendations = self._recommendations(ticker)
             
             if recommendations is not None and not recommendations.empty:
                 # Last 30 days
-                recent_date = datetime.now() - timedelta(days=30)
-                recent_recs = recommendations[pd.to_datetime(recommendations.index) > recent_date]
+                recent_date = self._recent_30d
+                rec_dates = pd.to_datetime(recommendations.index, errors='coerce')
+                recent_recs = recommendations.loc[rec_dates > recent_date]
                 
                 if len(recent_recs) > 0:
                     # Count upgrades vs downgrades
-                    upgrades = len(recent_recs[recent_recs['To Grade'].str.contains('Buy|Outperform|Overweight', case=False, na=False)])
-                    downgrades = len(recent_recs[recent_recs['To Grade'].str.contains('Sell|Underperform|Underweight', case=False, na=False)])
+                    grades = recent_recs['To Grade']
+                    upgrades = int(grades.str.contains(_UPGRADE_RE, na=False).sum())
+                    downgrades = int(grades.str.contains(_DOWNGRADE_RE, na=False).sum())
                     
                     score = 0
-                    signal = None
+                    signal = ''
                     
                     if upgrades > downgrades:
                         score = min(20, upgrades * 7)  # Max 20 points
@@ -253,79 +615,73 @@ class EarningsBeatScanner:
                         score = -10  # Negative signal
                         signal = f"{downgrades} recent downgrade(s)"
                     
-                    return {
-                        'has_activity': True,
-                        'score': score,
-                        'upgrades': upgrades,
-                        'downgrades': downgrades,
-                        'signal': signal
-                    }
+                    return CheckResult(
+                        has_data=True,
+                        score=score,
+                        signal=signal,
+                        details={'upgrades': upgrades, 'downgrades': downgrades}
+                    )
             
-            return {'has_activity': False, 'score': 0}
+            return CheckResult()
             
         except Exception as e:
             print(f"    ✗ Analyst check error: {e}")
-            return {'has_activity': False, 'score': 0}
+            return CheckResult()
     
-    def check_price_momentum(self, ticker: str) -> Dict[str, Any]:
+    def check_price_momentum(self, ticker: str) -> CheckResult:
         """Check if stock is building momentum into earnings"""
         print(f"  Checking price momentum for {ticker}...")
         
         try:
-            stock = yf.Ticker(ticker)
-            
             # Get 30-day price history
-            hist = stock.history(period='1mo')
+            hist = self._price_frame(ticker)
             
             if len(hist) > 5:
+                # Work on plain arrays to skip the pandas indexer on every lookup
+                close = hist['Close'].to_numpy()
+                high = hist['High'].to_numpy()
+                
                 # Calculate momentum signals
-                current_price = hist['Close'].iloc[-1]
-                price_10d_ago = hist['Close'].iloc[-10] if len(hist) >= 10 else hist['Close'].iloc[0]
+                current_price = close[-1]
+                price_10d_ago = close[-10] if close.size >= 10 else close[0]
                 
                 pct_change = ((current_price - price_10d_ago) / price_10d_ago) * 100
                 
                 # Check if price is near highs
-                high_30d = hist['High'].max()
+                high_30d = np.nanmax(high)
                 pct_from_high = ((current_price - high_30d) / high_30d) * 100
                 
-                score = 0
+                score = _score_momentum(pct_change, pct_from_high)
                 signals = []
                 
                 # Positive momentum
-                if pct_change > 5:
-                    score += 15
-                    signals.append(f"Up {pct_change:.1f}% in 10 days")
-                elif pct_change > 2:
-                    score += 10
+                if pct_change > 2:
                     signals.append(f"Up {pct_change:.1f}% in 10 days")
                 
-                # Near highs (consolidation at highs = bullish)
+                # Near highs
                 if pct_from_high > -3:
-                    score += 10
                     signals.append("Near 30-day highs")
                 
-                return {
-                    'has_momentum': score > 0,
-                    'score': score,
-                    'signals': signals,
-                    'pct_change_10d': pct_change
-                }
+                return CheckResult(
+                    has_data=True,
+                    score=score,
+                    signals=tuple(signals),
+                    details={'pct_change_10d': pct_change}
+                )
             
-            return {'has_momentum': False, 'score': 0}
+            return CheckResult()
             
         except Exception as e:
             print(f"    ✗ Momentum check error: {e}")
-            return {'has_momentum': False, 'score': 0}
+            return CheckResult()
     
-    def check_historical_beat_rate(self, ticker: str) -> Dict[str, Any]:
+    def check_historical_beat_rate(self, ticker: str) -> CheckResult:
         """Check company's historical earnings beat rate"""
         print(f"  Checking historical beat rate for {ticker}...")
         
         try:
-            stock = yf.Ticker(ticker)
-            
             # Get earnings history
-            earnings_hist = stock.earnings_dates
+            earnings_hist = self._earnings_dates(ticker)
             
             if earnings_hist is not None and not earnings_hist.empty:
                 # Look at last 4 quarters
@@ -338,149 +694,108 @@ class EarningsBeatScanner:
                     
                     if total > 0:
                         beat_rate = beats / total
+                        score = _score_beats(beats, total)
                         
-                        score = 0
-                        if beat_rate >= 0.75:  # 75%+ beat rate
-                            score = 20
-                        elif beat_rate >= 0.50:
-                            score = 10
-                        
-                        return {
-                            'has_history': True,
-                            'score': score,
-                            'beat_rate': beat_rate,
-                            'beats': beats,
-                            'total': total,
-                            'signal': f"{beats}/{total} quarters beat"
-                        }
+                        return CheckResult(
+                            has_data=True,
+                            score=score,
+                            signal=f"{beats}/{total} quarters beat",
+                            details={'beat_rate': beat_rate, 'beats': beats, 'total': total}
+                        )
             
-            return {'has_history': False, 'score': 0}
+            return CheckResult()
             
         except Exception as e:
             print(f"    ✗ Historical check error: {e}")
-            return {'has_history': False, 'score': 0}
+            return CheckResult()
     
-    def check_sector_momentum(self, ticker: str, sector: str) -> Dict[str, Any]:
+    def check_sector_momentum(self, ticker: str, sector: str) -> CheckResult:
         """Check if sector is outperforming (rising tide lifts all boats)"""
         print(f"  Checking sector momentum for {ticker}...")
         
         try:
             # Get sector ETF performance
-            sector_etfs = {
-                'Technology': 'XLK',
-                'Financial Services': 'XLF',
-                'Healthcare': 'XLV',
-                'Consumer Cyclical': 'XLY',
-                'Industrials': 'XLI',
-                'Energy': 'XLE',
-                'Consumer Defensive': 'XLP',
-                'Real Estate': 'XLRE',
-                'Communication Services': 'XLC',
-                'Utilities': 'XLU',
-                'Basic Materials': 'XLB'
-            }
-            
-            etf_ticker = sector_etfs.get(sector)
+            etf_ticker = self.SECTOR_ETFS.get(sector)
             
             if etf_ticker:
-                etf = yf.Ticker(etf_ticker)
-                spy = yf.Ticker('SPY')
+                # Returns are shared by every ticker in a sector, so compute them once
+                if self._spy_return is None:
+                    self._compute_sector_returns()
                 
-                # Get 10-day performance
-                etf_hist = etf.history(period='10d')
-                spy_hist = spy.history(period='10d')
+                outperformance = self._sector_returns[etf_ticker] - self._spy_return
+                score = _score_sector(outperformance)
                 
-                if len(etf_hist) > 0 and len(spy_hist) > 0:
-                    etf_return = ((etf_hist['Close'].iloc[-1] - etf_hist['Close'].iloc[0]) / etf_hist['Close'].iloc[0]) * 100
-                    spy_return = ((spy_hist['Close'].iloc[-1] - spy_hist['Close'].iloc[0]) / spy_hist['Close'].iloc[0]) * 100
-                    
-                    outperformance = etf_return - spy_return
-                    
-                    score = 0
-                    if outperformance > 2:
-                        score = 15
-                    elif outperformance > 0:
-                        score = 10
-                    
-                    return {
-                        'has_momentum': score > 0,
-                        'score': score,
-                        'outperformance': outperformance,
-                        'signal': f"Sector outperforming by {outperformance:.1f}%"
-                    }
+                return CheckResult(
+                    has_data=True,
+                    score=score,
+                    signal=f"Sector outperforming by {outperformance:.1f}%",
+                    details={'outperformance': outperformance}
+                )
             
-            return {'has_momentum': False, 'score': 0}
+            return CheckResult()
             
         except Exception as e:
             print(f"    ✗ Sector check error: {e}")
-            return {'has_momentum': False, 'score': 0}
+            return CheckResult()
     
-    def analyze_stock(self, stock_info: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_stock(self, stock_info: Dict[str, Any]) -> AnalysisResult:
         """Comprehensive analysis of a stock before earnings"""
         ticker = stock_info['ticker']
         
         print(f"\n📊 Analyzing {ticker} ({stock_info['company']})...")
         
-        analysis = {
-            'ticker': ticker,
-            'company': stock_info['company'],
-            'earnings_date': stock_info['earnings_date'],
-            'sector': stock_info['sector'],
-            'total_score': 0,
-            'signals': []
-        }
+        analysis = AnalysisResult(
+            ticker=ticker,
+            company=stock_info['company'],
+            earnings_date=stock_info['earnings_date'],
+            sector=stock_info['sector']
+        )
         
         # Run all checks
         esp = self.calculate_earnings_esp(ticker)
-        if esp['has_data']:
-            analysis['total_score'] += esp['esp_score']
-            if esp['esp_score'] > 0:
-                analysis['signals'].append(('📊 Earnings ESP', esp['esp_score'], esp['signal_strength']))
-        
-        time.sleep(1)
+        if esp.has_data:
+            analysis.total_score += esp.score
+            if esp.score > 0:
+                analysis.signals.append(('📊 Earnings ESP', esp.score, esp.signal))
         
         insider = self.check_insider_activity(ticker)
-        if insider['has_activity']:
-            analysis['total_score'] += insider['score']
-            analysis['signals'].append(('💼 Insider Activity', insider['score'], insider['signal']))
-        
-        time.sleep(1)
+        if insider.has_data:
+            analysis.total_score += insider.score
+            analysis.signals.append(('💼 Insider Activity', insider.score, insider.signal))
         
         analyst = self.check_analyst_activity(ticker)
-        if analyst['has_activity'] and analyst['score'] > 0:
-            analysis['total_score'] += analyst['score']
-            analysis['signals'].append(('📈 Analyst Activity', analyst['score'], analyst['signal']))
-        
-        time.sleep(1)
+        if analyst.has_data and analyst.score > 0:
+            analysis.total_score += analyst.score
+            analysis.signals.append(('📈 Analyst Activity', analyst.score, analyst.signal))
         
         momentum = self.check_price_momentum(ticker)
-        if momentum['has_momentum']:
-            analysis['total_score'] += momentum['score']
-            for signal in momentum['signals']:
-                analysis['signals'].append(('📈 Price Momentum', momentum['score'], signal))
-        
-        time.sleep(1)
+        if momentum.score > 0:
+            analysis.total_score += momentum.score
+            for signal in momentum.signals:
+                analysis.signals.append(('📈 Price Momentum', momentum.score, signal))
         
         history = self.check_historical_beat_rate(ticker)
-        if history['has_history']:
-            analysis['total_score'] += history['score']
-            analysis['signals'].append(('📜 Historical Beat Rate', history['score'], history['signal']))
-        
-        time.sleep(1)
+        if history.has_data:
+            analysis.total_score += history.score
+            analysis.signals.append(('📜 Historical Beat Rate', history.score, history.signal))
         
         sector = self.check_sector_momentum(ticker, stock_info['sector'])
-        if sector['has_momentum']:
-            analysis['total_score'] += sector['score']
-            analysis['signals'].append(('🏭 Sector Momentum', sector['score'], sector['signal']))
+        if sector.score > 0:
+            analysis.total_score += sector.score
+            analysis.signals.append(('🏭 Sector Momentum', sector.score, sector.signal))
         
-        print(f"  Total Score: {analysis['total_score']}/100")
+        print(f"  Total Score: {analysis.total_score}/100")
         
         return analysis
     
-    def send_earnings_alert(self, analysis: Dict[str, Any]):
+    def send_earnings_alert(self, analysis: AnalysisResult):
         """Send formatted earnings opportunity alert to Discord"""
-        ticker = analysis['ticker']
-        score = analysis['total_score']
+        self.send_discord_batch([self.build_earnings_embed(analysis)])
+    
+    def build_earnings_embed(self, analysis: AnalysisResult) -> Dict[str, Any]:
+        """Build the Discord embed for an earnings opportunity"""
+        ticker = analysis.ticker
+        score = analysis.total_score
         
         # Determine color and confidence
         if score >= 80:
@@ -494,18 +809,20 @@ class EarningsBeatScanner:
             confidence = "LOW CONFIDENCE"
         
         # Format earnings date
-        earnings_date = analysis['earnings_date']
-        days_until = (earnings_date - datetime.now()).days
+        earnings_date = analysis.earnings_date
+        days_until = (earnings_date - self._now).days
         date_str = earnings_date.strftime('%b %d, %Y')
         
-        description = f"**{confidence}** earnings beat setup\n"
-        description += f"📅 Earnings: {date_str} ({days_until} days)\n"
-        description += f"⭐ Score: **{score}**/100\n"
-        description += f"🏭 Sector: {analysis['sector']}\n\n"
+        description = (
+            f"**{confidence}** earnings beat setup\n"
+            f"📅 Earnings: {date_str} ({days_until} days)\n"
+            f"⭐ Score: **{score}**/100\n"
+            f"🏭 Sector: {analysis.sector}\n\n"
+        )
         
         # Add signals
         fields = []
-        for signal_name, signal_score, signal_detail in analysis['signals'][:6]:  # Max 6 signals
+        for signal_name, signal_score, signal_detail in analysis.signals[:6]:  # Max 6 signals
             fields.append({
                 "name": f"{signal_name} (+{signal_score})",
                 "value": signal_detail,
@@ -514,9 +831,9 @@ class EarningsBeatScanner:
         
         # Add suggested play
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            current_price = info.get('currentPrice', 0)
+            # Latest close from this scan's price history, not a day-old cached quote
+            closes = self._price_frame(ticker)['Close'].dropna()
+            current_price = float(closes.iloc[-1]) if len(closes) > 0 else 0
             
             if current_price > 0:
                 # Calculate position sizing
@@ -557,7 +874,7 @@ class EarningsBeatScanner:
             "inline": False
         })
         
-        self.send_discord_alert(
+        return self.build_embed(
             title=f"🎯 EARNINGS OPPORTUNITY: ${ticker}",
             description=description,
             color=color,
@@ -566,11 +883,16 @@ class EarningsBeatScanner:
     
     def run_scan(self):
         """Execute full earnings scan"""
+        self._now = datetime.now()
+        self._recent_30d = self._now - timedelta(days=30)
+        
         print(f"\n{'='*60}")
-        print(f"🚀 Starting Earnings Beat Scan")
-        print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("🚀 Starting Earnings Beat Scan")
+        print(f"⏰ {self._now.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*60}")
         
+        self._clear_caches()
+        
         # Get upcoming earnings
         upcoming_earnings = self.get_upcoming_earnings(days_ahead=7)
         
@@ -578,36 +900,44 @@ class EarningsBeatScanner:
             print("\n📊 No upcoming earnings found in the next 7 days")
             return
         
+        # One batched download covers every ticker, sector ETF and SPY
+        all_symbols = {s['ticker'] for s in upcoming_earnings} | set(self.SECTOR_ETFS.values()) | {'SPY'}
+        self._download_price_history(sorted(all_symbols))
+        self._compute_sector_returns()
+        
         print(f"\n📊 Analyzing {len(upcoming_earnings)} stocks...")
         
         high_priority = []
         
-        # Analyze each stock
-        for stock_info in upcoming_earnings:
-            try:
-                analysis = self.analyze_stock(stock_info)
-                
-                if analysis['total_score'] >= self.alert_threshold:
-                    high_priority.append(analysis)
-                    print(f"  ✓ {stock_info['ticker']}: {analysis['total_score']}/100 - ALERT!")
-                else:
-                    print(f"  ○ {stock_info['ticker']}: {analysis['total_score']}/100")
-                
-                time.sleep(2)  # Rate limiting between stocks
-                
-            except Exception as e:
-                print(f"  ✗ Error analyzing {stock_info['ticker']}: {e}")
-                continue
+        # Analyze stocks in parallel - each one is mostly waiting on Yahoo
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.analyze_stock, stock_info): stock_info
+                       for stock_info in upcoming_earnings}
+            
+            for future in as_completed(futures):
+                stock_info = futures[future]
+                try:
+                    analysis = future.result()
+                    
+                    if analysis.total_score >= self.alert_threshold:
+                        high_priority.append(analysis)
+                        print(f"  ✓ {stock_info['ticker']}: {analysis.total_score}/100 - ALERT!")
+                    else:
+                        print(f"  ○ {stock_info['ticker']}: {analysis.total_score}/100")
+                    
+                except Exception as e:
+                    print(f"  ✗ Error analyzing {stock_info['ticker']}: {e}")
+                    continue
         
-        # Send alerts for high-priority opportunities
+        # Send alerts for high-priority opportunities, batched into as few webhook posts as possible
         print(f"\n📢 Sending alerts for {len(high_priority)} opportunities...")
         
-        for analysis in sorted(high_priority, key=lambda x: x['total_score'], reverse=True):
-            self.send_earnings_alert(analysis)
-            time.sleep(2)  # Rate limit Discord webhooks
+        embeds = [self.build_earnings_embed(analysis)
+                  for analysis in sorted(high_priority, key=lambda x: x.total_score, reverse=True)]
+        self.send_discord_batch(embeds)
         
         print(f"\n{'='*60}")
-        print(f"✅ Scan complete")
+        print("✅ Scan complete")
         print(f"📊 Stocks analyzed: {len(upcoming_earnings)}")
         print(f"🎯 High-priority opportunities: {len(high_priority)}")
         print(f"{'='*60}\n")
@@ -0,0 +1,70 @@
+"""
+File-based TTL cache for Yahoo Finance responses
+Persists fetched data under .cache/ so repeated scans only hit the network for stale entries
+"""
+
+import os
+import pickle
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+class FileCache:
+    # Per-endpoint freshness, in seconds
+    ENDPOINT_TTLS = {
+        'calendar': 6 * 3600,
+        'earnings_dates': 7 * 24 * 3600,
+        'recommendations': 6 * 3600,
+        'history': 3600,
+    }
+
+    def __init__(self, base_dir: str = '.cache', default_ttl_seconds: int = 6 * 3600):
+        self.base_dir = base_dir
+        self.default_ttl_seconds = default_ttl_seconds
+
+    def _path(self, key: Tuple[str, str]) -> str:
+        ticker, endpoint = key
+        return os.path.join(self.base_dir, ticker, f"{endpoint}.pkl")
+
+    def _ttl(self, key: Tuple[str, str]) -> int:
+        endpoint = key[1].split('-')[0]  # e.g. 'history-1mo' -> 'history'
+        return self.ENDPOINT_TTLS.get(endpoint, self.default_ttl_seconds)
+
+    def get(self, key: Tuple[str, str]) -> Optional[Any]:
+        """Return the cached payload for (ticker, endpoint), or None if missing or expired"""
+        try:
+            with open(self._path(key), 'rb') as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None
+
+        if time.time() - entry['ts'] > self._ttl(key):
+            return None
+
+        return entry['payload']
+
+    def set(self, key: Tuple[str, str], value: Any):
+        """Store a payload for (ticker, endpoint) stamped with the current time"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'ts': time.time(), 'payload': value}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"    ✗ Cache write error for {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_or_compute(self, key: Tuple[str, str], compute: Callable[[], Any]) -> Any:
+        """Return the cached payload, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value)
+        return value